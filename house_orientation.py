@@ -2,20 +2,24 @@
 import argparse
 import math
 import os
-from typing import Tuple, List
+from typing import Optional, Tuple, List
 
 import matplotlib.pyplot as plt
 import matplotlib.image as mpimg
+import numba
+import numpy as np
+from numba import float64
 
 # ---------- Math helpers ----------
 
+_jit = numba.njit(cache=True, fastmath=True)
+
+@_jit
 def normalize_angle_deg(a: float) -> float:
     """Normalize angle to [0,360)."""
-    a = a % 360.0
-    if a < 0:
-        a += 360.0
-    return a
+    return a % 360.0
 
+@_jit
 def bearing_from_vector(dx: float, dy: float) -> float:
     """
     Convert image-space vector (dx, dy) to compass bearing in degrees, where:
@@ -29,32 +33,60 @@ def bearing_from_vector(dx: float, dy: float) -> float:
     deg = math.degrees(rad)
     return normalize_angle_deg(deg)
 
+@numba.vectorize([float64(float64, float64)], cache=True, fastmath=True)
+def bearings_from_vectors(dx, dy):
+    """Array version of bearing_from_vector (NumPy ufunc)."""
+    return bearing_from_vector(dx, dy)
+
+_DIRS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+
 def compass_8(bearing_deg: float) -> str:
-    """Map a bearing to the nearest 8-point compass direction."""
-    dirs = ["N", "NE", "E", "SE", "S", "SW", "W", "NW"]
-    idx = int((bearing_deg + 22.5) // 45) % 8
-    return dirs[idx]
+    """Map a bearing in [0,360) to the nearest 8-point compass direction."""
+    return _DIRS[int(bearing_deg*(1/45.0) + 0.5) & 7]
+
+_DIRS_ARR = np.array(_DIRS)
+
+def compass_8_vec(bearings_deg: np.ndarray) -> np.ndarray:
+    """Array version of compass_8, e.g. for the output of bearings_from_vectors."""
+    return _DIRS_ARR[(np.asarray(bearings_deg)*(1/45.0) + 0.5).astype(np.int32) & 7]
 
+@_jit
 def midpoint(p1, p2):
     return ((p1[0]+p2[0])/2.0, (p1[1]+p2[1])/2.0)
 
+@_jit
 def subtract(p1, p0):
     return (p1[0]-p0[0], p1[1]-p0[1])
 
+@_jit
 def dot(u, v):
     return u[0]*v[0] + u[1]*v[1]
 
+@_jit
 def perp(v):
     """Rotate vector 90° CCW in image coords (x right, y down)."""
     return (-v[1], v[0])
 
+@_jit
 def scale(v, s):
     return (v[0]*s, v[1]*s)
 
+@_jit
 def unit(v):
     n = math.hypot(v[0], v[1])
     return (v[0]/n, v[1]/n) if n != 0 else (0.0, 0.0)
 
+def _warmup():
+    """Compile the helpers at import so the first click isn't paying JIT cost."""
+    p, q = (0.0, 0.0), (1.0, 1.0)
+    bearing_from_vector(1.0, 1.0)
+    midpoint(p, q)
+    dot(p, q)
+    unit(perp(subtract(q, p)))
+    scale(q, -1.0)
+
+_warmup()
+
 # ---------- Interaction helpers ----------
 
 def get_points(ax, n: int, prompt: str):
@@ -69,7 +101,7 @@ def get_points(ax, n: int, prompt: str):
     for i, p in enumerate(pts):
         ax.text(p[0]+3, p[1]+3, f"{i+1}", fontsize=9, color="white",
                 bbox=dict(boxstyle="round,pad=0.2", fc="black", ec="none", alpha=0.6))
-    ax.figure.canvas.draw()
+    ax.figure.canvas.draw_idle()
     return pts
 
 def annotate_arrow(ax, p0, p1, label: str, color="yellow"):
@@ -106,19 +138,19 @@ def workflow_frontage(ax):
 
     # Frontage direction vector (along the facade)
     f = subtract(house_pts[1], house_pts[0])
-    f_u = unit(f)
 
-    # Normals to the frontage: n_left and n_right (in image coords)
-    n_left = unit(perp(f_u))          # 90° CCW from frontage
-    n_right = unit(scale(n_left, -1)) # opposite normal
+    # Normal to the frontage (90° CCW in image coords); left un-normalized,
+    # since only the sign of its dot product with to_street matters
+    n = perp(f)
 
     # Vector from frontage midpoint to street midpoint
     fm = midpoint(house_pts[0], house_pts[1])
     sm = midpoint(street_pts[0], street_pts[1])
-    to_street = unit(subtract(sm, fm))
+    to_street = subtract(sm, fm)
 
-    # Pick the frontage normal that points more toward the street (max dot product)
-    n_face = n_left if dot(n_left, to_street) >= dot(n_right, to_street) else n_right
+    # Flip the normal if needed so it points toward the street, then normalize once
+    sign = 1.0 if dot(n, to_street) >= 0 else -1.0
+    n_face = unit(scale(n, sign))
 
     # Bearing of the chosen normal
     b = bearing_from_vector(n_face[0], n_face[1])
@@ -134,22 +166,15 @@ def workflow_frontage(ax):
     annotate_arrow(ax, fm, tip, f"{c} ({b:.1f}°)")
     return b, c
 
-def main():
-    parser = argparse.ArgumentParser(description="Estimate house orientation from a map screenshot.")
-    parser.add_argument("image", help="Path to screenshot (PNG/JPG). North must be up.")
-    parser.add_argument("--mode", choices=["vector", "frontage"], default="vector",
-                        help="vector: 2 clicks (front -> street). frontage: 4 clicks (frontage and street lines).")
-    parser.add_argument("-o", "--output", default=None, help="Output annotated PNG path (default: <image>_annotated.png).")
-    args = parser.parse_args()
-
-    img = mpimg.imread(args.image)
-
-    fig, ax = plt.subplots()
-    ax.imshow(img)
-    ax.set_title(f"Click according to mode: {args.mode.upper()}")
+def process_image(ax, path: str, mode: str, out_path: Optional[str] = None):
+    """Run one click workflow on `path` using an existing axes, then save the annotated figure."""
+    ax.clear()
+    ax.imshow(mpimg.imread(path))
+    ax.set_title(f"Click according to mode: {mode.upper()}")
     ax.axis("off")
+    ax.figure.canvas.draw_idle()
 
-    if args.mode == "vector":
+    if mode == "vector":
         bearing, compass = workflow_vector(ax)
     else:
         bearing, compass = workflow_frontage(ax)
@@ -160,14 +185,31 @@ def main():
             bbox=dict(boxstyle="round,pad=0.4", fc="black", ec="none", alpha=0.6))
 
     # Save annotated output
-    base, _ = os.path.splitext(args.image)
-    out_path = args.output or f"{base}_annotated.png"
-    fig.savefig(out_path, dpi=150, bbox_inches="tight")
+    base, _ = os.path.splitext(path)
+    out_path = out_path or f"{base}_annotated.png"
+    ax.figure.savefig(out_path, dpi=150, bbox_inches="tight")
     print(txt)
     print(f"Saved annotated image to: {out_path}")
+    return bearing, compass
+
+def main():
+    parser = argparse.ArgumentParser(description="Estimate house orientation from map screenshots.")
+    parser.add_argument("images", nargs="+", help="Path(s) to screenshot (PNG/JPG). North must be up.")
+    parser.add_argument("--mode", choices=["vector", "frontage"], default="vector",
+                        help="vector: 2 clicks (front -> street). frontage: 4 clicks (frontage and street lines).")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output annotated PNG path (default: <image>_annotated.png). Single image only.")
+    args = parser.parse_args()
+    if args.output and len(args.images) > 1:
+        parser.error("--output can only be used with a single image")
+
+    # One figure for the whole run; each image clears and reuses the axes
+    _, ax = plt.subplots()
+    for path in args.images:
+        process_image(ax, path, args.mode, args.output)
 
     # Also show interactively so you can visually confirm
     plt.show()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,66 +1,180 @@
 import cv2
 import numpy as np
-import pytesseract
+import tesserocr
+import threading
 import math
+from dataclasses import dataclass
+from PIL import Image
+
+# Tesseract API kept resident so trained data is loaded once per process
+API = tesserocr.PyTessBaseAPI(psm=tesserocr.PSM.AUTO)
+_API_LOCK = threading.Lock()
 
 def bearing_from_vec(dx, dy):
     ang = math.degrees(math.atan2(dx, -dy)) % 360
     return ang
 
+def atan2_approx(y, x):
+    """Polynomial atan2 over arrays (max error ~2e-4 rad, plenty for 8-point compass)."""
+    y = np.asarray(y, dtype=np.float32)
+    x = np.asarray(x, dtype=np.float32)
+    ax, ay = np.abs(x), np.abs(y)
+    mx = np.maximum(ax, ay)
+    a = np.minimum(ax, ay) / np.where(mx == 0, 1, mx)
+    s = a*a
+    r = ((-0.0464964749*s + 0.15931422)*s - 0.327622764)*s*a + a
+    # fold the [0, pi/4] result back out to the full circle
+    r = np.where(ay > ax, np.pi/2 - r, r)
+    r = np.where(x < 0, np.pi - r, r)
+    return np.where(y < 0, -r, r)
+
+def bearings_from_vectors(dx, dy):
+    """Array version of bearing_from_vec; scalar callers should keep using bearing_from_vec."""
+    return np.degrees(atan2_approx(dx, -np.asarray(dy))) % 360
+
+def make_bearing_to(house_x, house_y):
+    """
+    Specialize bearings for a fixed house point: returns f(xs, ys) giving the
+    bearing from the house to every point in one array pass.
+    Offsets are taken in float64 before atan2_approx drops to float32, so large
+    coordinates (e.g. Web Mercator meters) keep their precision.
+    """
+    hx, hy = float(house_x), float(house_y)
+    def bearing_to(xs, ys):
+        dx = np.asarray(xs, dtype=np.float64) - hx
+        neg_dy = hy - np.asarray(ys, dtype=np.float64)
+        return np.degrees(atan2_approx(dx, neg_dy)) % 360
+    return bearing_to
+
+_DIRS = ("N","NE","E","SE","S","SW","W","NW")
+
 def compass8(b):
-    dirs = ["N","NE","E","SE","S","SW","W","NW"]
-    return dirs[int((b + 22.5)//45)%8]
+    return _DIRS[int(b*(1/45.0) + 0.5) & 7]
 
-def get_text_boxes(image):
-    """Run OCR and return (text, (cx, cy)) for each detected word."""
-    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-    blur = cv2.GaussianBlur(gray, (3,3), 0)
-    thresh = cv2.threshold(blur, 180, 255, cv2.THRESH_BINARY)[1]
+_DIRS_ARR = np.array(_DIRS)
 
-    data = pytesseract.image_to_data(thresh, output_type=pytesseract.Output.DICT)
-    results = []
-    for i, text in enumerate(data["text"]):
-        if text.strip():
-            (x, y, w, h) = (data["left"][i], data["top"][i],
-                            data["width"][i], data["height"][i])
-            cx, cy = x + w/2, y + h/2
-            results.append((text.strip(), (cx, cy)))
-    return results
+def compass8_vec(b):
+    """Array version of compass8: bearings in [0,360) -> array of labels."""
+    return _DIRS_ARR[(np.asarray(b)*(1/45.0) + 0.5).astype(np.int32) & 7]
 
-def find_orientation(img_path, target_label):
-    img = cv2.imread(img_path)
-    texts = get_text_boxes(img)
+def image_to_data(thresh):
+    """Word-level OCR on a binary image, shaped like pytesseract's Output.DICT."""
+    data = {"text": [], "left": [], "top": [], "width": [], "height": []}
+    level = tesserocr.RIL.WORD
+    with _API_LOCK:
+        API.SetImage(Image.fromarray(thresh))
+        API.Recognize()
+        it = API.GetIterator()
+        if it is None:
+            return data
+        for r in tesserocr.iterate_level(it, level):
+            text = r.GetUTF8Text(level)
+            box = r.BoundingBox(level)
+            if not text or box is None:
+                continue
+            x1, y1, x2, y2 = box
+            data["text"].append(text)
+            data["left"].append(x1)
+            data["top"].append(y1)
+            data["width"].append(x2 - x1)
+            data["height"].append(y2 - y1)
+    return data
+
+# per-thread (gray, thresh) scratch buffers, reused while the image size is unchanged
+_scratch = threading.local()
+
+def _buffers(shape):
+    bufs = getattr(_scratch, "bufs", None)
+    if bufs is None or bufs[0].shape != shape:
+        bufs = (np.empty(shape, np.uint8), np.empty(shape, np.uint8))
+        _scratch.bufs = bufs
+    return bufs
 
+@dataclass
+class OCRBoxes:
+    """OCR words as parallel arrays: texts (N,) str and centers (N,2) float32 (cx, cy)."""
+    texts: np.ndarray
+    centers: np.ndarray
+
+def get_text_boxes(image) -> OCRBoxes:
+    """Run OCR and return the detected words with their box centers."""
+    gray, thresh = _buffers(image.shape[:2])
+    cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=gray)
+    cv2.GaussianBlur(gray, (3,3), 0, dst=thresh)
+    cv2.threshold(thresh, 180, 255, cv2.THRESH_BINARY, dst=thresh)  # pointwise, safe in place
+
+    data = image_to_data(thresh)
+    txt = np.char.strip(np.asarray(data["text"], dtype=str))
+    L, T = np.asarray(data["left"]), np.asarray(data["top"])
+    W, H = np.asarray(data["width"]), np.asarray(data["height"])
+
+    keep = np.char.str_len(txt) > 0
+    cx = L[keep] + W[keep]/2
+    cy = T[keep] + H[keep]/2
+    return OCRBoxes(txt[keep], np.stack([cx, cy], axis=1).astype(np.float32))
+
+def locate_house_and_road(boxes: OCRBoxes, target_label):
+    """Return (house, road, road_point) from OCR words for the given house label."""
     # locate the house label (e.g., "13")
-    house_points = [p for t, p in texts if t == str(target_label)]
-    if not house_points:
+    house_points = boxes.centers[np.char.equal(boxes.texts, str(target_label))]
+    if not len(house_points):
         raise ValueError(f"Could not find label {target_label}")
     house = np.mean(house_points, axis=0)
 
     # locate road labels (heuristic: long words, likely top of image)
-    road_candidates = [(t, p) for t, p in texts if len(t) > 4]
-    if not road_candidates:
+    is_road = np.char.str_len(boxes.texts) > 4
+    if not is_road.any():
         raise ValueError("No road label detected")
-    # pick nearest road
-    road, road_point = min(road_candidates,
-                           key=lambda tp: np.linalg.norm(np.array(tp[1]) - house))
+    # pick nearest road (squared distance is enough for argmin)
+    road_texts, road_centers = boxes.texts[is_road], boxes.centers[is_road]
+    d2 = ((road_centers - house)**2).sum(axis=1)
+    i = int(d2.argmin())
+    return house, str(road_texts[i]), road_centers[i]
+
+def find_orientation(img_path, target_label):
+    img = cv2.imread(img_path)
+    house, road, road_point = locate_house_and_road(get_text_boxes(img), target_label)
 
     # compute vector & bearing
     dx, dy = road_point[0] - house[0], road_point[1] - house[1]
     b = bearing_from_vec(dx, dy)
     dir8 = compass8(b)
 
-    # visualize
-    vis = img.copy()
-    cv2.arrowedLine(vis, tuple(np.int32(house)),
+    # visualize (img is our own freshly loaded buffer, so draw on it directly)
+    cv2.arrowedLine(img, tuple(np.int32(house)),
                     tuple(np.int32(road_point)), (0,255,255), 2, tipLength=0.1)
-    cv2.putText(vis, f"{dir8} ({b:.1f}°)", (20,40),
+    cv2.putText(img, f"{dir8} ({b:.1f}°)", (20,40),
                 cv2.FONT_HERSHEY_SIMPLEX, 1, (0,255,0), 2)
-    cv2.imshow("Result", vis)
+    cv2.imshow("Result", img)
     cv2.waitKey(0)
     cv2.destroyAllWindows()
 
     print(f"House {target_label} faces {dir8} ({b:.1f}°) toward {road}")
 
+def find_orientation_batch(img_paths, target_labels):
+    """
+    Headless find_orientation over many screenshots.
+    The OCR engine stays loaded between images, so each one only pays for recognition.
+    Returns a list of (direction, bearing, road) in input order; images that can't
+    be read, or where the house or road label can't be found, give (None, None, None).
+    """
+    results = []
+    for img_path, target_label in zip(img_paths, target_labels, strict=True):
+        img = cv2.imread(img_path)
+        if img is None:
+            print(f"{img_path}: could not read image")
+            results.append((None, None, None))
+            continue
+        boxes = get_text_boxes(img)
+        try:
+            house, road, road_point = locate_house_and_road(boxes, target_label)
+        except ValueError as e:
+            print(f"{img_path}: {e}")
+            results.append((None, None, None))
+            continue
+        b = bearing_from_vec(road_point[0] - house[0], road_point[1] - house[1])
+        results.append((compass8(b), b, road))
+    return results
+
 if __name__ == "__main__":
     find_orientation("houses.png", target_label=13)
@@ -1,91 +1,245 @@
 # v1: Bearing from house point to nearest road
-# pip install requests shapely pyproj
+# pip install requests aiohttp diskcache numpy
 
+import asyncio
+import functools
+import os
+import weakref
+from math import atan2, cos, degrees, radians
+
+import aiohttp
+import diskcache
+import numpy as np
 import requests
-from shapely.geometry import Point, LineString, shape
-from pyproj import Transformer
-from math import atan2, degrees
+from requests.adapters import HTTPAdapter
 
 UA = {"User-Agent": "house-orientation-v1"}
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+OVERPASS_URL = "https://overpass-api.de/api/interpreter"
+
+# One pooled keep-alive session so repeated lookups reuse TLS connections
+SESSION = requests.Session()
+SESSION.headers.update(UA)
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
+# Geocodes and road queries persist across runs; only cache misses hit the network
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+CACHE_EXPIRE = 24 * 3600
+
+@functools.lru_cache(maxsize=None)
+def _cache():
+    """Open the on-disk cache on first use, so importing the module touches no files."""
+    return diskcache.Cache(CACHE_DIR)
+
+def _grid(lon: float, lat: float):
+    """Snap to a ~10 m grid so nearby road queries share a cache entry."""
+    return round(lon, 4), round(lat, 4)
+
+# Max distance from a point to its _grid centre (half-cell diagonal is <8 m);
+# padded onto the queried radius so snapping never drops a road near the edge
+GRID_SNAP_M = 10
+
+# Public OSM endpoints: Nominatim allows 1 request/s, overpass-api.de ~2 slots per IP
+NOMINATIM_INTERVAL_S = 1.0
+OVERPASS_SLOTS = 2
+_limits = weakref.WeakKeyDictionary()
+
+def _rate_limits():
+    """(nominatim, overpass) semaphores for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _limits:
+        _limits[loop] = (asyncio.Semaphore(1), asyncio.Semaphore(OVERPASS_SLOTS))
+    return _limits[loop]
+
+def _parse_geocode(j):
+    if not j:
+        raise ValueError("Address not found")
+    return float(j[0]["lon"]), float(j[0]["lat"])
 
+@functools.lru_cache(maxsize=1024)
 def geocode(address: str):
-    r = requests.get(
-        "https://nominatim.openstreetmap.org/search",
+    key = ("geocode", address)
+    hit = _cache().get(key)
+    if hit is not None:
+        return hit
+    r = SESSION.get(
+        NOMINATIM_URL,
         params={"q": address, "format": "json", "limit": 1},
-        headers=UA,
         timeout=20,
     )
     r.raise_for_status()
-    j = r.json()
-    if not j:
-        raise ValueError("Address not found")
-    return float(j[0]["lon"]), float(j[0]["lat"])
+    lonlat = _parse_geocode(r.json())
+    _cache().set(key, lonlat, expire=CACHE_EXPIRE)
+    return lonlat
 
 def overpass(query: str):
-    r = requests.post(
-        "https://overpass-api.de/api/interpreter",
+    r = SESSION.post(
+        OVERPASS_URL,
         data={"data": query},
-        headers=UA,
         timeout=30,
     )
     r.raise_for_status()
     return r.json()
 
-def fetch_nearby_roads(lon: float, lat: float, radius_m: int = 100):
-    q = f"""
+async def geocode_async(session: aiohttp.ClientSession, address: str):
+    key = ("geocode", address)
+    hit = await asyncio.to_thread(lambda: _cache().get(key))
+    if hit is not None:
+        return hit
+    nominatim, _ = _rate_limits()
+    async with nominatim:
+        async with session.get(
+            NOMINATIM_URL,
+            params={"q": address, "format": "json", "limit": 1},
+            timeout=aiohttp.ClientTimeout(total=20),
+        ) as r:
+            r.raise_for_status()
+            j = await r.json()
+        # hold the slot so consecutive requests are at least 1 s apart
+        await asyncio.sleep(NOMINATIM_INTERVAL_S)
+    lonlat = _parse_geocode(j)
+    await asyncio.to_thread(lambda: _cache().set(key, lonlat, expire=CACHE_EXPIRE))
+    return lonlat
+
+async def overpass_async(session: aiohttp.ClientSession, query: str):
+    _, slots = _rate_limits()
+    async with slots:
+        async with session.post(
+            OVERPASS_URL,
+            data={"data": query},
+            timeout=aiohttp.ClientTimeout(total=30),
+        ) as r:
+            r.raise_for_status()
+            return await r.json(content_type=None)
+
+def _roads_query(lon: float, lat: float, radius_m: int):
+    return f"""
     [out:json][timeout:25];
     way(around:{radius_m},{lat},{lon})[highway];
     out geom;
     """
-    data = overpass(q)
+
+def fetch_nearby_roads(lon: float, lat: float, radius_m: int = 100):
+    return _fetch_roads_on_grid(*_grid(lon, lat), radius_m)
+
+@functools.lru_cache(maxsize=256)
+def _fetch_roads_on_grid(lon: float, lat: float, radius_m: int):
+    key = ("ways", lon, lat, radius_m)
+    hit = _cache().get(key)
+    if hit is not None:
+        return hit
+    roads = _parse_roads(overpass(_roads_query(lon, lat, radius_m + GRID_SNAP_M)))
+    _cache().set(key, roads, expire=CACHE_EXPIRE)
+    return roads
+
+async def fetch_nearby_roads_async(session: aiohttp.ClientSession, lon: float, lat: float, radius_m: int = 100):
+    lon, lat = _grid(lon, lat)
+    key = ("ways", lon, lat, radius_m)
+    hit = await asyncio.to_thread(lambda: _cache().get(key))
+    if hit is not None:
+        return hit
+    roads = _parse_roads(await overpass_async(session, _roads_query(lon, lat, radius_m + GRID_SNAP_M)))
+    await asyncio.to_thread(lambda: _cache().set(key, roads, expire=CACHE_EXPIRE))
+    return roads
+
+def _parse_roads(data):
     roads = []
     for el in data.get("elements", []):
         if "geometry" not in el:
             continue
         coords = [(pt["lon"], pt["lat"]) for pt in el["geometry"]]
         if len(coords) >= 2:
-            roads.append(LineString(coords))
+            roads.append(np.array(coords, dtype=float))
     return roads
 
-_transformer_fwd = Transformer.from_crs("EPSG:4326","EPSG:3857", always_xy=True)
+# EPSG:3857 (spherical Web Mercator) is closed-form, so no pyproj/shapely needed
+R_EARTH = 6378137.0
+
+def to_3857_xy(lon, lat):
+    """Project lon/lat degrees (scalars or arrays) to Web Mercator meters."""
+    x = np.deg2rad(lon) * R_EARTH
+    y = R_EARTH * np.log(np.tan(np.pi/4 + np.deg2rad(lat)/2))
+    return x, y
+
+def project_roads(roads):
+    """Project a list of (N,2) lon/lat road arrays to EPSG:3857 in one vectorized call."""
+    offsets = np.cumsum([0] + [len(road_ll) for road_ll in roads])
+    lonlat = np.concatenate(roads)
+    xy = np.column_stack(to_3857_xy(lonlat[:, 0], lonlat[:, 1]))
+    return [xy[s:e] for s, e in zip(offsets[:-1], offsets[1:])]
 
-def to_3857_xy(lon: float, lat: float):
-    return _transformer_fwd.transform(lon, lat)
+def nearest_point_on_roads(p, road_xys):
+    """Closest point to p over every segment of every road: (road index, (qx, qy), distance)."""
+    A = np.concatenate([c[:-1] for c in road_xys])
+    B = np.concatenate([c[1:] for c in road_xys])
+    road_id = np.repeat(np.arange(len(road_xys)), [len(c) - 1 for c in road_xys])
+
+    P = np.asarray(p, dtype=float)
+    AB = B - A
+    len2 = (AB**2).sum(axis=1)
+    t = np.clip(((P - A)*AB).sum(axis=1) / np.where(len2 == 0, 1, len2), 0, 1)
+    Q = A + t[:, None]*AB
+    d2 = ((P - Q)**2).sum(axis=1)
+    i = int(d2.argmin())
+    return int(road_id[i]), tuple(Q[i]), float(np.sqrt(d2[i]))
 
 def bearing_from_point_to_point(px, py, qx, qy):
     # x = Easting, y = Northing (meters). Bearing: 0°=North, 90°=East.
-    dx, dy = (qx - px), (qy - py)
-    theta = degrees(atan2(dy, dx))      # angle from +x (east), CCW
-    return (90 - theta) % 360
+    # Web Mercator on WGS84 lat/lon is only near-conformal; the azimuth error
+    # is ~0.1-0.2°, negligible for an 8-point compass.
+    return degrees(atan2(qx - px, qy - py)) % 360
+
+_DIRS = ("N","NE","E","SE","S","SW","W","NW")
 
 def bearing_to_compass(bearing_deg):
-    dirs = ["N","NE","E","SE","S","SW","W","NW"]
-    idx = int((bearing_deg + 22.5) // 45) % 8
-    return dirs[idx]
+    # bearing_deg is in [0,360); & 7 wraps 360 back to N
+    return _DIRS[int(bearing_deg*(1/45.0) + 0.5) & 7]
 
 def nearest_road_bearing_from_address(address: str, search_radius_m: int = 120):
     lon, lat = geocode(address)
     roads = fetch_nearby_roads(lon, lat, search_radius_m)
+    return nearest_road_bearing(lon, lat, roads)
+
+async def nearest_road_bearing_from_address_async(session: aiohttp.ClientSession, address: str, search_radius_m: int = 120):
+    lon, lat = await geocode_async(session, address)
+    roads = await fetch_nearby_roads_async(session, lon, lat, search_radius_m)
+    return nearest_road_bearing(lon, lat, roads)
+
+async def _run_batch(addresses, search_radius_m: int = 120):
+    connector = aiohttp.TCPConnector(limit=16)
+    async with aiohttp.ClientSession(headers=UA, connector=connector) as session:
+        results = await asyncio.gather(
+            *[nearest_road_bearing_from_address_async(session, a, search_radius_m) for a in addresses],
+            return_exceptions=True,
+        )
+    # one bad address (not found, 429, timeout) shouldn't discard the rest
+    return [
+        {"address": a, "bearing_deg": None, "note": f"Lookup failed: {r!r}"}
+        if isinstance(r, Exception) else r
+        for a, r in zip(addresses, results)
+    ]
+
+def run_batch(addresses, search_radius_m: int = 120):
+    """
+    Resolve many addresses concurrently, within the OSM servers' rate limits.
+    Results are in input order; failed lookups get a dict with a "note" instead.
+    """
+    return asyncio.run(_run_batch(addresses, search_radius_m))
+
+def nearest_road_bearing(lon: float, lat: float, roads):
     if not roads:
         return {"lat": lat, "lon": lon, "bearing_deg": None, "note": "No roads found nearby"}
 
     # Project to meters for robust nearest-point math
     px, py = to_3857_xy(lon, lat)
-    p = Point(px, py)
-
-    # Find nearest road and nearest point on that road
-    best = None
-    best_dist = float("inf")
-    for road_ll in roads:
-        # project road to 3857
-        road_xy = LineString([to_3857_xy(x, y) for (x, y) in road_ll.coords])
-        d = p.distance(road_xy)
-        if d < best_dist:
-            best_dist = d
-            best = road_xy
-
-    q = best.interpolate(best.project(p))  # nearest point on road to the house point
-    qx, qy = q.x, q.y
+    road_xys = project_roads(roads)
+
+    # Nearest point on any road to the house point
+    _, (qx, qy), best_dist = nearest_point_on_roads((px, py), road_xys)
+    # Mercator meters are stretched by sec(lat); scale back to ground meters
+    best_dist *= cos(radians(lat))
 
     bearing = bearing_from_point_to_point(px, py, qx, qy)
     return {
@@ -96,5 +250,5 @@ def nearest_road_bearing_from_address(address: str, search_radius_m: int = 120):
         "distance_to_road_m": round(best_dist, 2),
     }
 
-# Run:
-print(nearest_road_bearing_from_address("3 David St, St Kilda East VIC 3183"))
+if __name__ == "__main__":
+    print(nearest_road_bearing_from_address("3 David St, St Kilda East VIC 3183"))